@@ -2,36 +2,30 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from io import BytesIO
-from typing import List, Optional
-
-import httpx
-from telegram import (
-    InlineKeyboardButton,
-    InlineKeyboardMarkup,
-    Message,
-    Update,
-    WebAppInfo,
-)
-from telegram.ext import (
-    Application,
-    ApplicationBuilder,
-    CommandHandler,
-    ContextTypes,
-    MessageHandler,
-    filters,
-)
+from typing import TYPE_CHECKING, List, Optional
 
 from mememe.config import MememeBotConfig
 from mememe.models import CropBox, ImageSource, MemeRequest, TextLayer
-from mememe.rendering import FontResolver, MemeRenderer
+from mememe.rendering import ByteSource, FontResolver, MemeRenderer, RenderMemory
+from mememe.outbound import OutboundSender
+from mememe.scheduling import PRIORITY_FULL, PRIORITY_PREVIEW, RenderScheduler
+from mememe.startup import READY_CATALOG, READY_FONTS, ReadinessGate, StartupTimer
+from mememe.status import StatusReporter
 from mememe.template_catalog import TemplateCatalog
 from mememe.webapp_payload import parse_webapp_payload
 
+# telegram and httpx are imported where they are first needed so that importing
+# this module (workers, tooling) does not pay for them up front.
+if TYPE_CHECKING:
+    from telegram import Message, Update
+    from telegram.ext import Application, ContextTypes
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+memory_logger = logging.getLogger("mememe.memory")
 
 DEFAULT_STATUS_TEXT = "Generating your meme…"
+INFLIGHT_PER_WORKER = 2
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -44,6 +38,8 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 
 async def invite_memestudio(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    from telegram import InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
+
     config: MememeBotConfig = context.application.bot_data["config"]
     if not config.webapp_url:
         await update.effective_message.reply_text(
@@ -140,43 +136,167 @@ async def _process_request(update: Update, context: ContextTypes.DEFAULT_TYPE, r
     message = update.effective_message
     if message is None:
         return
-    status = await message.reply_text(DEFAULT_STATUS_TEXT)
+    config: MememeBotConfig = context.application.bot_data["config"]
+    sender: OutboundSender = context.application.bot_data["sender"]
+    status = StatusReporter(message, sender, config.status_strategy, config.status_threshold, DEFAULT_STATUS_TEXT)
+    inflight: asyncio.Semaphore = context.application.bot_data["inflight"]
     try:
-        base_bytes = await _download_source(context, request)
-        renderer: MemeRenderer = context.application.bot_data["renderer"]
-        loop = asyncio.get_running_loop()
-        output: BytesIO = await loop.run_in_executor(None, lambda: renderer.render(base_bytes, request))
+        await status.start()
+        # Updates are handled concurrently; only a bounded number of memes may hold
+        # a downloaded source at once, which caps memory and keeps new previews from
+        # starving the full-quality renders already in the pipeline.
+        async with inflight:
+            await _build_and_deliver(context, message, status, request)
     except Exception as exc:
         logger.exception("Failed to build meme")
-        await status.edit_text(f"Failed to generate meme: {exc}")
+        try:
+            await status.fail(f"Failed to generate meme: {exc}")
+        except Exception:
+            logger.exception("Failed to report meme failure")
+    finally:
+        # Never leave a chat-action loop or threshold timer running past the handler.
+        await status.stop()
+
+
+async def _build_and_deliver(
+    context: ContextTypes.DEFAULT_TYPE, message: Message, status: StatusReporter, request: MemeRequest
+) -> None:
+    config: MememeBotConfig = context.application.bot_data["config"]
+    renderer: MemeRenderer = context.application.bot_data["renderer"]
+    scheduler: RenderScheduler = context.application.bot_data["scheduler"]
+    sender: OutboundSender = context.application.bot_data["sender"]
+    base_bytes = await _download_source(context, request)
+    preview_side = _preview_side(config, renderer, base_bytes, request)
+    if preview_side:
+        output = await scheduler.run(PRIORITY_PREVIEW, renderer.render, base_bytes, request, preview_side)
+    else:
+        output = await scheduler.run(PRIORITY_FULL, renderer.render, base_bytes, request)
+    caption = (request.caption or "memeME")[:1024]
+    if preview_side:
+        await _deliver_progressive(message, status, sender, scheduler, renderer, base_bytes, request, output, caption)
+        return
+    # Same as the progressive path: the meme itself is about to land, so no late
+    # status message or chat action. Edits only touch a posted status message.
+    await status.stop()
+    await status.update("Uploading meme…")
+    await sender.send(message.chat_id, lambda: message.reply_photo(photo=output, caption=caption))
+    await status.finish()
+
+
+async def _deliver_progressive(
+    message: Message,
+    status: StatusReporter,
+    sender: OutboundSender,
+    scheduler: RenderScheduler,
+    renderer: MemeRenderer,
+    base_bytes: ByteSource,
+    request: MemeRequest,
+    preview: bytes,
+    caption: str,
+) -> None:
+    from telegram import InputMediaPhoto
+
+    # The preview is about to land and is progress enough: don't post a late
+    # status message under it or keep the chat action going during the full render.
+    await status.stop()
+    sent = await sender.send(message.chat_id, lambda: message.reply_photo(photo=preview, caption=caption))
+    await status.update("Preview sent, finishing full quality…")
+    try:
+        # Full-quality renders queue behind new previews when all workers are busy.
+        output: bytes = await scheduler.run(PRIORITY_FULL, renderer.render, base_bytes, request)
+        await sender.send(
+            message.chat_id,
+            lambda: sent.edit_media(media=InputMediaPhoto(media=output, caption=caption)),
+        )
+    except Exception:
+        logger.exception("Failed to finish full-quality meme")
+        await status.finish("Couldn't finish the full-quality version; keeping the preview.")
         return
+    await status.finish()
+
 
-    caption = request.caption or "memeME"
-    await status.edit_text("Uploading meme…")
-    await message.reply_photo(photo=output, caption=caption[:1024])
-    await status.edit_text("Done ✅")
+def _preview_side(
+    config: MememeBotConfig, renderer: MemeRenderer, base_bytes: ByteSource, request: MemeRequest
+) -> Optional[int]:
+    """Return the preview bound when a preview tier is worth sending, else ``None``."""
+    if not config.progressive_preview or config.preview_max_side <= 0:
+        return None
+    width, height = renderer.source_size(base_bytes)
+    if request.crop_box:
+        width = int(width * request.crop_box.width)
+        height = int(height * request.crop_box.height)
+    if max(width, height) <= config.preview_max_side:
+        return None
+    return config.preview_max_side
 
 
-async def _download_source(context: ContextTypes.DEFAULT_TYPE, request: MemeRequest) -> bytes:
+async def _download_source(context: ContextTypes.DEFAULT_TYPE, request: MemeRequest) -> ByteSource:
+    config: MememeBotConfig = context.application.bot_data["config"]
     if request.source == ImageSource.TEMPLATE and request.template_id:
         catalog: TemplateCatalog = context.application.bot_data["catalog"]
         template = await catalog.ensure_template(request.template_id)
-        return await _fetch_url(template.source_url)
+        return await _fetch_url(template.source_url, config.max_source_bytes)
     if request.source == ImageSource.REMOTE_URL and request.image_url:
-        return await _fetch_url(request.image_url)
+        return await _fetch_url(request.image_url, config.max_source_bytes)
     if request.source == ImageSource.TELEGRAM_FILE and request.telegram_file_id:
         file = await context.bot.get_file(request.telegram_file_id)
-        buffer = BytesIO()
-        await file.download_to_memory(out=buffer)
-        return buffer.getvalue()
+        if file.file_size and file.file_size > config.max_source_bytes:
+            raise ValueError(_too_large(config.max_source_bytes))
+        sink = _BytesSink()
+        await file.download_to_memory(out=sink)
+        return sink.data
     raise RuntimeError("Invalid meme request; missing source image.")
 
 
-async def _fetch_url(url: str) -> bytes:
+async def _fetch_url(url: str, max_bytes: int) -> bytearray:
+    """Stream ``url`` into a single buffer, sized up front when the length is known."""
+    import httpx
+
     async with httpx.AsyncClient(timeout=httpx.Timeout(15.0)) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        return response.content
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            declared = int(response.headers.get("Content-Length") or 0)
+            if declared > max_bytes:
+                raise ValueError(_too_large(max_bytes))
+            data = bytearray(declared)
+            filled = 0
+            async for chunk in response.aiter_bytes():
+                end = filled + len(chunk)
+                if end > max_bytes:
+                    raise ValueError(_too_large(max_bytes))
+                data[filled:end] = chunk
+                filled = end
+            del data[filled:]
+            return data
+
+
+class _BytesSink:
+    """Write target that keeps the bytes PTB downloaded instead of copying them.
+
+    ``File.download_to_memory`` retrieves the whole file as ``bytes`` and hands
+    it to ``out.write``; a BytesIO or ``download_as_bytearray`` would copy it.
+    """
+
+    def __init__(self) -> None:
+        self.data: ByteSource = b""
+
+    def write(self, data: bytes) -> int:
+        self.data = data if not self.data else bytes(self.data) + data
+        return len(data)
+
+
+def _too_large(max_bytes: int) -> str:
+    return f"Source image is larger than {max_bytes // (1024 * 1024)} MB."
+
+
+def _log_render_memory(request: MemeRequest, tier: str, memory: RenderMemory) -> None:
+    memory_logger.info(
+        "render tier=%s source=%s peak_bytes=%d output_bytes=%d",
+        tier,
+        request.source.value,
+        memory.peak,
+        memory.held.get("output", 0),
+    )
 
 
 def _extract_file_id(message: Message) -> Optional[str]:
@@ -218,16 +338,72 @@ def _default_layer(text: str, position: str, font_name: str) -> TextLayer:
     )
 
 
+async def warm_up(application: Application) -> None:
+    """Index fonts and load the catalog snapshot, then fire the readiness signal."""
+    timer: StartupTimer = application.bot_data["startup_timer"]
+    readiness: ReadinessGate = application.bot_data["readiness"]
+    renderer: MemeRenderer = application.bot_data["renderer"]
+    catalog: TemplateCatalog = application.bot_data["catalog"]
+    loop = asyncio.get_running_loop()
+    # A ready file from a crashed previous run must not pass probes before we are ready.
+    readiness.reset()
+
+    async def index_fonts() -> None:
+        with timer.phase("fonts"):
+            count = await loop.run_in_executor(None, renderer.font_resolver.index)
+        logger.info("Indexed %d font files.", count)
+        readiness.mark(READY_FONTS)
+
+    async def load_catalog() -> None:
+        with timer.phase("catalog"):
+            refreshed = await catalog.refresh()
+        if not refreshed:
+            logger.warning("Starting with the seed template catalog.")
+        readiness.mark(READY_CATALOG)
+
+    readiness.on_ready(lambda: logger.info("memeME ready: %s", timer.report()))
+    await asyncio.gather(index_fonts(), load_catalog())
+
+
+async def shut_down(application: Application) -> None:
+    scheduler: RenderScheduler = application.bot_data["scheduler"]
+    scheduler.shutdown()
+
+
 def build_application() -> Application:
-    config = MememeBotConfig.from_env()
-    catalog = TemplateCatalog(endpoint=config.templates_endpoint, max_templates=config.max_templates)
-    font_resolver = FontResolver(config.font_search_paths, config.default_font)
-    renderer = MemeRenderer(font_resolver)
+    timer = StartupTimer()
+    with timer.phase("config"):
+        config = MememeBotConfig.from_env()
+    with timer.phase("imports"):
+        from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters
+    with timer.phase("build"):
+        catalog = TemplateCatalog(endpoint=config.templates_endpoint, max_templates=config.max_templates)
+        font_resolver = FontResolver(config.font_search_paths, config.default_font)
+        renderer = MemeRenderer(font_resolver, memory_hook=_log_render_memory)
+        scheduler = RenderScheduler(config.render_workers)
+        sender = OutboundSender()
+        # One meme rendering and one downloading/uploading per worker.
+        inflight = asyncio.Semaphore(max(1, config.render_workers) * INFLIGHT_PER_WORKER)
+        readiness = ReadinessGate({READY_FONTS, READY_CATALOG}, ready_file=config.ready_file)
+        application = (
+            ApplicationBuilder()
+            .token(config.token)
+            .base_url(config.api_base_url)
+            .base_file_url(config.api_file_url)
+            .concurrent_updates(True)
+            .post_init(warm_up)
+            .post_shutdown(shut_down)
+            .build()
+        )
 
-    application = ApplicationBuilder().token(config.token).build()
     application.bot_data["config"] = config
     application.bot_data["catalog"] = catalog
     application.bot_data["renderer"] = renderer
+    application.bot_data["scheduler"] = scheduler
+    application.bot_data["sender"] = sender
+    application.bot_data["inflight"] = inflight
+    application.bot_data["startup_timer"] = timer
+    application.bot_data["readiness"] = readiness
 
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("mememe", invite_memestudio))
@@ -236,11 +412,11 @@ def build_application() -> Application:
     application.add_handler(MessageHandler(filters.ALL, log_update_debug))
     application.add_handler(MessageHandler(filters.PHOTO | filters.Document.IMAGE, prompt_photo_reply))
 
-    # Periodically refresh templates to keep list fresh.
+    # Periodically refresh templates to keep list fresh; warm_up loads the first snapshot.
     async def refresh_catalog(_: ContextTypes.DEFAULT_TYPE) -> None:
         await catalog.refresh()
 
-    application.job_queue.run_repeating(refresh_catalog, interval=60 * 60 * 6, first=10)
+    application.job_queue.run_repeating(refresh_catalog, interval=60 * 60 * 6)
     return application
 
 
@@ -0,0 +1 @@
+"""Load-test harness for memeME; run ``python -m loadtest --help``."""
@@ -0,0 +1,328 @@
+"""Replay a mix of ``/caption`` and WebApp updates against a local memeME bot.
+
+Starts the stub Bot API/image host, launches ``bot.py`` pointed at it, waits
+for the readiness file, injects updates as a Poisson process at ``--rate``
+and reports throughput, latency percentiles and the bot's memory use::
+
+    python -m loadtest --rate 10 --duration 30 --env MEMEME_STATUS=none
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .stub_server import PHOTO_SIZES, StubServer, StubState
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LOADTEST_TOKEN = "123456:LOADTEST"
+FIRST_CHAT_ID = 10_000
+_RENDER_MEMORY = re.compile(rb"mememe\.memory:render tier=(\w+) .*peak_bytes=(\d+)")
+RENDER_TIERS = ("preview", "full")
+
+_CAPTIONS = [
+    ("when the load test", "finally passes"),
+    ("one does not simply", "skip the benchmark"),
+    ("p99 latency", "p99 problems"),
+    ("me explaining", "the flood limits"),
+]
+
+
+class MemorySampler(threading.Thread):
+    """Polls ``/proc/<pid>/status`` for the bot's resident and peak memory."""
+
+    def __init__(self, pid: int, interval: float = 0.2) -> None:
+        super().__init__(name="memory-sampler", daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[int] = []
+        self.peak_kb: Optional[int] = None
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            status = _read_proc_status(self.pid)
+            if status is None:
+                return
+            if "VmRSS" in status:
+                self.samples.append(status["VmRSS"])
+            if "VmHWM" in status:
+                self.peak_kb = status["VmHWM"]
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+def caption_message(chat_id: int, rng: random.Random) -> Dict[str, Any]:
+    top, bottom = rng.choice(_CAPTIONS)
+    photo_index = rng.randrange(len(PHOTO_SIZES))
+    width, height = PHOTO_SIZES[photo_index]
+    command = f"/caption {top} || {bottom}"
+    message = _base_message(chat_id, message_id=2)
+    message["text"] = command
+    message["entities"] = [{"type": "bot_command", "offset": 0, "length": len("/caption")}]
+    message["reply_to_message"] = _base_message(chat_id, message_id=1)
+    message["reply_to_message"]["photo"] = [
+        {"file_id": f"photo{photo_index}", "file_unique_id": f"photo{photo_index}", "width": width, "height": height}
+    ]
+    return message
+
+
+def webapp_message(chat_id: int, rng: random.Random, template_ids: List[str]) -> Dict[str, Any]:
+    top, bottom = rng.choice(_CAPTIONS)
+    layers = [{"text": top, "position": "top"}, {"text": bottom, "position": "bottom"}]
+    if rng.random() < 0.3:
+        layers.append(
+            {"text": "zoom", "position": "custom", "anchor": {"x": rng.random(), "y": rng.random()}, "sizePct": 6}
+        )
+    payload: Dict[str, Any] = {
+        "source": "template",
+        "templateId": rng.choice(template_ids),
+        "layers": layers,
+        "caption": f"{top} / {bottom}",
+    }
+    if rng.random() < 0.4:
+        payload["crop"] = {"x": 0.0, "y": 0.1, "width": 1.0, "height": 0.8}
+    message = _base_message(chat_id, message_id=1)
+    message["web_app_data"] = {"data": json.dumps(payload), "button_text": "Send to Bot"}
+    return message
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    state = StubState(retry_after_rate=args.retry_after_rate, seed=args.seed)
+    server = StubServer(state, port=args.port)
+    server.start()
+
+    with tempfile.TemporaryDirectory(prefix="mememe-loadtest-") as tmp:
+        ready_file = Path(tmp) / "ready"
+        env = dict(os.environ)
+        env.update(
+            {
+                "MEMEME_BOT_TOKEN": LOADTEST_TOKEN,
+                "MEMEME_API_BASE_URL": f"{server.url}/bot",
+                "MEMEME_API_FILE_URL": f"{server.url}/file/bot",
+                "MEMEME_TEMPLATE_ENDPOINT": f"{server.url}/get_memes",
+                "MEMEME_READY_FILE": str(ready_file),
+            }
+        )
+        env.update(_parse_env(args.env))
+        log_path = args.bot_log or Path(tmp) / "bot.log"
+        log = open(log_path, "wb")
+        started = time.monotonic()
+        bot = subprocess.Popen([sys.executable, "bot.py"], cwd=REPO_ROOT, env=env, stdout=log, stderr=log)
+        sampler = MemorySampler(bot.pid)
+        sampler.start()
+        try:
+            _wait_ready(bot, ready_file, timeout=args.ready_timeout)
+            ready_after = time.monotonic() - started
+            injected = _inject(state, rng, args)
+            _drain(state, timeout=args.drain)
+        finally:
+            sampler.stop()
+            _stop(bot)
+            server.shutdown()
+            log.close()
+        render_peaks: Dict[str, List[int]] = {tier: [] for tier in RENDER_TIERS}
+        for tier, peak in _RENDER_MEMORY.findall(log_path.read_bytes()):
+            render_peaks.setdefault(tier.decode(), []).append(int(peak))
+    return _report(state, sampler, injected, ready_after, render_peaks, args)
+
+
+def _inject(state: StubState, rng: random.Random, args: argparse.Namespace) -> int:
+    template_ids = list(state.templates)
+    count = max(1, int(args.rate * args.duration))
+    next_at = time.monotonic()
+    for index in range(count):
+        next_at += rng.expovariate(args.rate)
+        delay = next_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        chat_id = FIRST_CHAT_ID + index
+        if rng.random() < args.caption_share:
+            state.push_update(chat_id, "caption", caption_message(chat_id, rng))
+        else:
+            state.push_update(chat_id, "webapp", webapp_message(chat_id, rng, template_ids))
+    return count
+
+
+def _drain(state: StubState, timeout: float, quiet: float = 2.0) -> None:
+    # Full-quality replacements may trail the first image, so also wait for the
+    # stub to go quiet before calling the run finished.
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        pending = [t for t in state.traces.values() if t.last_image_at is None and not t.failed]
+        if not pending and time.monotonic() - state.last_call_at >= quiet:
+            return
+        time.sleep(0.1)
+
+
+def _report(
+    state: StubState,
+    sampler: MemorySampler,
+    injected: int,
+    ready_after: float,
+    render_peaks: Dict[str, List[int]],
+    args: argparse.Namespace,
+) -> Dict[str, Any]:
+    traces = list(state.traces.values())
+    completed = [t for t in traces if t.last_image_at is not None]
+    first_image = [t.first_image_at - t.injected_at for t in completed]
+    final_image = [t.last_image_at - t.injected_at for t in completed]
+    window = 0.0
+    if completed:
+        window = max(t.last_image_at for t in completed) - min(t.injected_at for t in traces)
+    calls: Dict[str, int] = {}
+    for trace in traces:
+        for method, count in trace.calls.items():
+            calls[method] = calls.get(method, 0) + count
+    return {
+        "target_rate": args.rate,
+        "injected": injected,
+        "completed": len(completed),
+        "failed": sum(1 for t in traces if t.failed),
+        "lost": injected - len(completed) - sum(1 for t in traces if t.failed and t.last_image_at is None),
+        "throughput_per_s": len(completed) / window if window else 0.0,
+        "ready_after_s": ready_after,
+        "first_image_latency_s": _percentiles(first_image),
+        "final_image_latency_s": _percentiles(final_image),
+        "api_calls_per_meme": {method: count / max(1, len(traces)) for method, count in sorted(calls.items())},
+        "injected_429s": state.retries_sent,
+        "render_peak_mb": {
+            tier: _percentiles([peak / (1024 * 1024) for peak in peaks]) for tier, peaks in render_peaks.items()
+        },
+        "rss_peak_mb": sampler.peak_kb / 1024 if sampler.peak_kb else None,
+        "rss_mean_mb": sum(sampler.samples) / len(sampler.samples) / 1024 if sampler.samples else None,
+    }
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(pct: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+    return {"p50": rank(50), "p90": rank(90), "p99": rank(99), "max": ordered[-1]}
+
+
+def _format(report: Dict[str, Any]) -> str:
+    lines = [
+        f"injected {report['injected']} updates at {report['target_rate']:.1f}/s "
+        f"(bot ready after {report['ready_after_s']:.2f}s)",
+        f"completed {report['completed']}, failed {report['failed']}, lost {report['lost']}, "
+        f"throughput {report['throughput_per_s']:.2f} memes/s",
+    ]
+    for label, key in (("first image", "first_image_latency_s"), ("final image", "final_image_latency_s")):
+        stats = report[key]
+        if stats:
+            lines.append(
+                f"{label:<12} p50 {stats['p50']:.3f}s  p90 {stats['p90']:.3f}s  "
+                f"p99 {stats['p99']:.3f}s  max {stats['max']:.3f}s"
+            )
+    for tier, render_peak in report["render_peak_mb"].items():
+        if render_peak:
+            lines.append(
+                f"{tier + ' peak':<12} p50 {render_peak['p50']:.1f}MB  p90 {render_peak['p90']:.1f}MB  "
+                f"p99 {render_peak['p99']:.1f}MB  max {render_peak['max']:.1f}MB"
+            )
+    per_meme = ", ".join(f"{method} {count:.2f}" for method, count in report["api_calls_per_meme"].items())
+    lines.append(f"api calls per meme: {per_meme or 'none'} (injected 429s: {report['injected_429s']})")
+    if report["rss_peak_mb"] is not None:
+        lines.append(f"bot memory: peak RSS {report['rss_peak_mb']:.1f} MB, mean RSS {report['rss_mean_mb']:.1f} MB")
+    else:
+        lines.append("bot memory: unavailable (needs /proc)")
+    return "\n".join(lines)
+
+
+def _base_message(chat_id: int, message_id: int) -> Dict[str, Any]:
+    return {
+        "message_id": message_id,
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private", "first_name": "Load"},
+        "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+    }
+
+
+def _wait_ready(bot: subprocess.Popen, ready_file: Path, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while not ready_file.exists():
+        if bot.poll() is not None:
+            raise RuntimeError(f"bot.py exited with status {bot.returncode} before becoming ready.")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"bot.py was not ready after {timeout:.0f}s.")
+        time.sleep(0.05)
+
+
+def _stop(bot: subprocess.Popen) -> None:
+    if bot.poll() is not None:
+        return
+    bot.send_signal(signal.SIGINT)
+    try:
+        bot.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        bot.kill()
+        bot.wait()
+
+
+def _read_proc_status(pid: int) -> Optional[Dict[str, int]]:
+    try:
+        text = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+    values: Dict[str, int] = {}
+    for line in text.splitlines():
+        key, _, rest = line.partition(":")
+        if key in ("VmRSS", "VmHWM"):
+            values[key] = int(rest.split()[0])
+    return values
+
+
+def _parse_env(pairs: List[str]) -> Dict[str, str]:
+    env: Dict[str, str] = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"--env expects KEY=VALUE, got {pair!r}")
+        env[key] = value
+    return env
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=5.0, help="mean updates per second (default 5)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of traffic to inject (default 30)")
+    parser.add_argument(
+        "--caption-share", type=float, default=0.4, help="fraction of /caption updates vs WebApp (default 0.4)"
+    )
+    parser.add_argument(
+        "--retry-after-rate", type=float, default=0.0, help="probability of answering a chat call with 429"
+    )
+    parser.add_argument("--drain", type=float, default=60.0, help="max seconds to wait for stragglers (default 60)")
+    parser.add_argument("--ready-timeout", type=float, default=60.0, help="max seconds to wait for bot readiness")
+    parser.add_argument("--port", type=int, default=0, help="stub server port (default: any free port)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for a reproducible traffic mix")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra bot environment")
+    parser.add_argument("--bot-log", type=Path, default=None, help="write the bot's output to this file")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    print(json.dumps(report, indent=2) if args.json else _format(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Local stand-in for the Telegram Bot API and the template image host.
+
+Serves just enough of the Bot API for memeME to poll updates, download photos
+and deliver memes, plus an Imgflip-style ``/get_memes`` endpoint and the
+template images it points at. Every outbound call is traced per chat so the
+load generator can compute end-to-end latencies.
+"""
+
+from __future__ import annotations
+
+import email
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+TEMPLATE_SIZES: List[Tuple[int, int]] = [(1200, 1200), (1200, 800), (600, 908), (2048, 1536), (800, 1000)]
+PHOTO_SIZES: List[Tuple[int, int]] = [(1280, 960), (960, 1280), (1280, 720), (2560, 1920)]
+IMAGE_CALLS = ("sendPhoto", "editMessageMedia")
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "memeME", "username": "mememe_loadtest_bot"}
+
+
+@dataclass(slots=True)
+class ChatTrace:
+    injected_at: float
+    kind: str
+    first_image_at: Optional[float] = None
+    last_image_at: Optional[float] = None
+    calls: Dict[str, int] = field(default_factory=dict)
+    failed: bool = False
+
+
+class StubState:
+    """Shared state behind the HTTP handler; every method is thread-safe."""
+
+    def __init__(self, retry_after_rate: float = 0.0, seed: Optional[int] = None) -> None:
+        self.retry_after_rate = retry_after_rate
+        self._random = random.Random(seed)
+        self._cond = threading.Condition()
+        self._updates: List[Dict[str, Any]] = []
+        self._next_update_id = 1
+        self._next_message_id = 1
+        self.traces: Dict[int, ChatTrace] = {}
+        self.templates: Dict[str, Tuple[int, int]] = {
+            str(100 + index): size for index, size in enumerate(TEMPLATE_SIZES)
+        }
+        self.images: Dict[str, bytes] = {
+            f"{template_id}.jpg": _make_image(size, self._random) for template_id, size in self.templates.items()
+        }
+        self.photos: Dict[str, bytes] = {
+            f"photo{index}": _make_image(size, self._random) for index, size in enumerate(PHOTO_SIZES)
+        }
+        self.retries_sent = 0
+        self.last_call_at = 0.0
+
+    def push_update(self, chat_id: int, kind: str, message: Dict[str, Any]) -> None:
+        with self._cond:
+            self.traces[chat_id] = ChatTrace(injected_at=time.monotonic(), kind=kind)
+            self._updates.append({"update_id": self._next_update_id, "message": message})
+            self._next_update_id += 1
+            self._cond.notify_all()
+
+    def get_updates(self, offset: int, timeout: float) -> List[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._updates = [update for update in self._updates if update["update_id"] >= offset]
+            while not self._updates:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return list(self._updates[:100])
+
+    def record_call(self, method: str, params: Dict[str, str]) -> Optional[int]:
+        """Trace a call; returns a ``retry_after`` value when a flood error should be faked."""
+        now = time.monotonic()
+        with self._cond:
+            self.last_call_at = now
+            trace = self.traces.get(_int(params.get("chat_id")))
+            if trace is None:
+                return None
+            # Only chat-bound calls are flood-limited, so startup calls never fail.
+            if self.retry_after_rate and self._random.random() < self.retry_after_rate:
+                self.retries_sent += 1
+                return 1
+            trace.calls[method] = trace.calls.get(method, 0) + 1
+            if method in IMAGE_CALLS:
+                if trace.first_image_at is None:
+                    trace.first_image_at = now
+                trace.last_image_at = now
+            elif params.get("text", "").startswith("Failed"):
+                trace.failed = True
+        return None
+
+    def message(self, chat_id: int, *, photo: bool = False, text: Optional[str] = None) -> Dict[str, Any]:
+        with self._cond:
+            message_id = self._next_message_id
+            self._next_message_id += 1
+        result: Dict[str, Any] = {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+        }
+        if photo:
+            result["photo"] = [
+                {"file_id": f"sent{message_id}", "file_unique_id": f"sent{message_id}", "width": 1, "height": 1}
+            ]
+        if text is not None:
+            result["text"] = text
+        return result
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server: "StubServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - BaseHTTPRequestHandler API
+        pass
+
+    def do_GET(self) -> None:
+        self._dispatch()
+
+    def do_POST(self) -> None:
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        path = urlsplit(self.path).path
+        state = self.server.state
+        if path == "/get_memes":
+            self._send_json({"success": True, "data": {"memes": self._memes()}})
+        elif path.startswith("/images/") and path[len("/images/") :] in state.images:
+            self._send_bytes(state.images[path[len("/images/") :]], "image/jpeg")
+        elif path.startswith("/file/bot"):
+            file_id = path.rsplit("/", 1)[-1].removesuffix(".jpg")
+            if file_id in state.photos:
+                self._send_bytes(state.photos[file_id], "image/jpeg")
+            else:
+                self._send_json({"ok": False, "error_code": 404, "description": "Not Found"}, status=404)
+        elif path.startswith("/bot"):
+            self._bot_method(path.rsplit("/", 1)[-1])
+        else:
+            self._send_json({"ok": False, "error_code": 404, "description": "Not Found"}, status=404)
+
+    def _bot_method(self, method: str) -> None:
+        state = self.server.state
+        params = self._read_params()
+        if method == "getUpdates":
+            timeout = min(float(params.get("timeout") or 0), 10.0)
+            result: Any = state.get_updates(_int(params.get("offset")), timeout)
+            self._send_json({"ok": True, "result": result})
+            return
+        retry_after = state.record_call(method, params)
+        if retry_after is not None:
+            self._send_json(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {retry_after}",
+                    "parameters": {"retry_after": retry_after},
+                },
+                status=429,
+            )
+            return
+        chat_id = _int(params.get("chat_id"))
+        if method == "getMe":
+            result = BOT_USER
+        elif method == "getFile":
+            file_id = params.get("file_id", "")
+            result = {"file_id": file_id, "file_unique_id": file_id, "file_path": f"photos/{file_id}.jpg"}
+        elif method in IMAGE_CALLS:
+            result = state.message(chat_id, photo=True)
+        elif method in ("sendMessage", "editMessageText"):
+            result = state.message(chat_id, text=params.get("text", ""))
+        else:
+            result = True
+        self._send_json({"ok": True, "result": result})
+
+    def _memes(self) -> List[Dict[str, Any]]:
+        host = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+        return [
+            {
+                "id": template_id,
+                "name": f"Load test template {template_id}",
+                "url": f"{host}/images/{template_id}.jpg",
+                "width": width,
+                "height": height,
+            }
+            for template_id, (width, height) in self.server.state.templates.items()
+        ]
+
+    def _read_params(self) -> Dict[str, str]:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            return _parse_multipart(content_type, body)
+        if content_type.startswith("application/json"):
+            return {key: str(value) for key, value in json.loads(body or b"{}").items()}
+        query = urlsplit(self.path).query
+        raw = body.decode() if body else query
+        return {key: values[-1] for key, values in parse_qs(raw).items()}
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+        self._send_bytes(json.dumps(payload).encode(), "application/json", status)
+
+    def _send_bytes(self, body: bytes, content_type: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, state: StubState, host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__((host, port), StubHandler)
+        self.state = state
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name="stub-server", daemon=True)
+        thread.start()
+        return thread
+
+
+def _parse_multipart(content_type: str, body: bytes) -> Dict[str, str]:
+    message = email.message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    params: Dict[str, str] = {}
+    for part in message.get_payload() or []:
+        name = part.get_param("name", header="content-disposition")
+        if not name:
+            continue
+        payload = part.get_payload(decode=True) or b""
+        if part.get_filename() is None:
+            params[name] = payload.decode(errors="replace")
+        else:
+            params[name] = f"<{len(payload)} bytes>"
+    return params
+
+
+def _make_image(size: Tuple[int, int], rng: random.Random) -> bytes:
+    # Noise over a gradient compresses roughly like a real photo.
+    base = Image.linear_gradient("L").resize(size)
+    noise = Image.effect_noise(size, rng.uniform(20, 60))
+    img = Image.merge("RGB", (base, noise, base.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def _int(value: Optional[str]) -> int:
+    try:
+        return int(value or 0)
+    except ValueError:
+        return 0
@@ -2,10 +2,24 @@
 
 from __future__ import annotations
 
+import importlib
+from types import ModuleType
+
 __all__ = [
     "config",
     "models",
+    "outbound",
     "rendering",
+    "scheduling",
+    "startup",
+    "status",
     "template_catalog",
     "webapp_payload",
 ]
+
+
+def __getattr__(name: str) -> ModuleType:
+    # Submodules are imported on first access so ``import mememe`` stays cheap.
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
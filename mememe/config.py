@@ -3,10 +3,18 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 
 DEFAULT_TEMPLATE_ENDPOINT = "https://api.imgflip.com/get_memes"
+DEFAULT_API_BASE_URL = "https://api.telegram.org/bot"
+DEFAULT_API_FILE_URL = "https://api.telegram.org/file/bot"
+
+STATUS_NONE = "none"
+STATUS_CHAT_ACTION = "chat_action"
+STATUS_THRESHOLD = "threshold"
+STATUS_MESSAGE = "message"
+STATUS_STRATEGIES = (STATUS_NONE, STATUS_CHAT_ACTION, STATUS_THRESHOLD, STATUS_MESSAGE)
 
 
 @dataclass(slots=True)
@@ -17,6 +25,15 @@ class MememeBotConfig:
     max_templates: int = 70
     font_search_paths: List[Path] = None
     default_font: str = "Impact.ttf"
+    ready_file: Optional[Path] = None
+    progressive_preview: bool = True
+    preview_max_side: int = 512
+    render_workers: int = 2
+    status_strategy: str = STATUS_THRESHOLD
+    status_threshold: float = 1.5
+    api_base_url: str = DEFAULT_API_BASE_URL
+    api_file_url: str = DEFAULT_API_FILE_URL
+    max_source_bytes: int = 20 * 1024 * 1024
 
     @classmethod
     def from_env(cls) -> "MememeBotConfig":
@@ -27,6 +44,19 @@ class MememeBotConfig:
         endpoint = os.getenv("MEMEME_TEMPLATE_ENDPOINT", DEFAULT_TEMPLATE_ENDPOINT).strip()
         max_templates = int(os.getenv("MEMEME_TEMPLATE_LIMIT", "70"))
         default_font = os.getenv("MEMEME_DEFAULT_FONT", "Impact.ttf").strip()
+        raw_ready_file = os.getenv("MEMEME_READY_FILE", "").strip()
+        progressive_preview = os.getenv("MEMEME_PROGRESSIVE", "1").strip().lower() not in ("0", "false", "no", "off")
+        preview_max_side = int(os.getenv("MEMEME_PREVIEW_SIZE", "512"))
+        render_workers = int(os.getenv("MEMEME_RENDER_WORKERS", "2"))
+        status_strategy = os.getenv("MEMEME_STATUS", STATUS_THRESHOLD).strip().lower()
+        if status_strategy not in STATUS_STRATEGIES:
+            raise RuntimeError(
+                f"MEMEME_STATUS must be one of {', '.join(STATUS_STRATEGIES)}; got {status_strategy!r}."
+            )
+        status_threshold = float(os.getenv("MEMEME_STATUS_THRESHOLD", "1.5"))
+        api_base_url = os.getenv("MEMEME_API_BASE_URL", DEFAULT_API_BASE_URL).strip()
+        api_file_url = os.getenv("MEMEME_API_FILE_URL", DEFAULT_API_FILE_URL).strip()
+        max_source_bytes = int(os.getenv("MEMEME_MAX_SOURCE_BYTES", str(20 * 1024 * 1024)))
 
         font_paths: List[Path]
         raw_paths = os.getenv("MEMEME_FONT_PATHS")
@@ -46,4 +76,13 @@ class MememeBotConfig:
             max_templates=max_templates,
             font_search_paths=font_paths,
             default_font=default_font,
+            ready_file=Path(raw_ready_file) if raw_ready_file else None,
+            progressive_preview=progressive_preview,
+            preview_max_side=preview_max_side,
+            render_workers=render_workers,
+            status_strategy=status_strategy,
+            status_threshold=status_threshold,
+            api_base_url=api_base_url or DEFAULT_API_BASE_URL,
+            api_file_url=api_file_url or DEFAULT_API_FILE_URL,
+            max_source_bytes=max_source_bytes,
         )
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_PRUNE_THRESHOLD = 1024
+
+
+@dataclass(slots=True)
+class _TokenBucket:
+    rate: float
+    capacity: float
+    tokens: float = field(init=False)
+    updated: float = field(init=False, default=0.0)
+
+    def __post_init__(self) -> None:
+        self.tokens = self.capacity
+
+    def reserve(self, now: float) -> float:
+        """Take one token, returning how long to wait before it may be used."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def idle(self, now: float) -> bool:
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+@dataclass(slots=True)
+class _Job:
+    factory: Callable[[], Awaitable[Any]]
+    key: Optional[Hashable]
+    futures: List[asyncio.Future]
+
+
+class OutboundSender:
+    """Serialises Bot API calls per chat, paced to Telegram's flood limits.
+
+    Calls for one chat run in order through a token bucket (private chats and
+    groups have separate rates) plus a global bucket shared by all chats. A
+    call queued with a ``key`` replaces a not-yet-sent call with the same key,
+    so bursts of status edits collapse into the latest one. ``RetryAfter``
+    responses pause the chat for exactly the advertised delay and retry.
+    """
+
+    def __init__(
+        self,
+        chat_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        burst: float = 3.0,
+        global_rate: float = 30.0,
+        max_retries: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self._clock = clock
+        self._global = _TokenBucket(rate=global_rate, capacity=global_rate)
+        self._global.updated = clock()
+        self._buckets: Dict[int, _TokenBucket] = {}
+        self._blocked_until: Dict[int, float] = {}
+        self._queues: Dict[int, Deque[_Job]] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+
+    async def send(
+        self,
+        chat_id: int,
+        factory: Callable[[], Awaitable[Any]],
+        key: Optional[Hashable] = None,
+    ) -> Any:
+        """Queue ``factory`` for ``chat_id`` and wait for its result.
+
+        ``factory`` is called once per attempt, so it must build a fresh request
+        (and rewind any upload buffers) each time.
+        """
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.setdefault(chat_id, deque())
+        pending = next((job for job in queue if key is not None and job.key == key), None)
+        if pending is not None:
+            pending.factory = factory
+            pending.futures.append(future)
+        else:
+            queue.append(_Job(factory=factory, key=key, futures=[future]))
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._drain(chat_id))
+        return await future
+
+    async def _drain(self, chat_id: int) -> None:
+        queue = self._queues[chat_id]
+        try:
+            while queue:
+                await self._wait_for_slot(chat_id)
+                job = queue.popleft()
+                try:
+                    result = await self._call(chat_id, job.factory)
+                except Exception as exc:
+                    for future in job.futures:
+                        if not future.done():
+                            future.set_exception(exc)
+                else:
+                    for future in job.futures:
+                        if not future.done():
+                            future.set_result(result)
+        finally:
+            del self._workers[chat_id]
+            if not queue:
+                del self._queues[chat_id]
+            if len(self._buckets) > _PRUNE_THRESHOLD:
+                self._prune()
+
+    async def _wait_for_slot(self, chat_id: int) -> None:
+        now = self._clock()
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            rate = self.group_rate if chat_id < 0 else self.chat_rate
+            bucket = self._buckets[chat_id] = _TokenBucket(rate=rate, capacity=self.burst)
+            bucket.updated = now
+        delay = max(
+            bucket.reserve(now),
+            self._global.reserve(now),
+            self._blocked_until.get(chat_id, 0.0) - now,
+        )
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _call(self, chat_id: int, factory: Callable[[], Awaitable[Any]]) -> Any:
+        from telegram.error import RetryAfter
+
+        attempt = 0
+        while True:
+            try:
+                return await factory()
+            except RetryAfter as exc:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                delay = _seconds(exc.retry_after)
+                self._blocked_until[chat_id] = self._clock() + delay
+                logger.warning("Flood limit hit for chat %s; retrying in %.1fs.", chat_id, delay)
+                await asyncio.sleep(delay)
+
+    def _prune(self) -> None:
+        now = self._clock()
+        for chat_id in [chat_id for chat_id, bucket in self._buckets.items() if bucket.idle(now)]:
+            if chat_id not in self._workers:
+                del self._buckets[chat_id]
+        for chat_id in [chat_id for chat_id, until in self._blocked_until.items() if until <= now]:
+            del self._blocked_until[chat_id]
+
+
+def _seconds(retry_after: Any) -> float:
+    # python-telegram-bot reports an int today and a timedelta in newer releases.
+    total_seconds = getattr(retry_after, "total_seconds", None)
+    if total_seconds is not None:
+        return float(total_seconds())
+    return float(retry_after)
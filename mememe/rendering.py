@@ -1,27 +1,56 @@
 from __future__ import annotations
 
-import math
-from dataclasses import dataclass
-from io import BytesIO
+import io
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, Tuple
-
-from PIL import Image, ImageDraw, ImageFont
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional, Tuple, Union
 
 from .models import CropBox, MemeRequest, TextLayer
 
+if TYPE_CHECKING:
+    from PIL import Image, ImageDraw, ImageFont
+
 
 @dataclass(slots=True)
 class FontResolver:
     search_paths: Iterable[Path]
     default_font: str
+    _index: Optional[Dict[str, Path]] = field(init=False, default=None)
+
+    def index(self) -> int:
+        """Scan the search paths once so ``resolve`` usually skips the filesystem probe.
+
+        Fonts are keyed by their path relative to the search path they were found
+        in (``Impact.ttf``, ``truetype/dejavu/DejaVuSerif.ttf``); earlier search
+        paths win. Names missing from the index still fall back to probing, so
+        fonts added after startup are found. Returns the number of indexed files.
+        """
+        from PIL import ImageFont  # noqa: F401 - warm the import off the request path
+
+        index: Dict[str, Path] = {}
+        for base in self.search_paths:
+            try:
+                entries = sorted(base.rglob("*"))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_file():
+                    index.setdefault(entry.relative_to(base).as_posix(), entry)
+        self._index = index
+        return len(index)
 
     def resolve(self, font_name: str, size: int) -> ImageFont.FreeTypeFont:
+        from PIL import ImageFont
+
         candidates = [font_name, self.default_font]
         for candidate in candidates:
             path = Path(candidate)
             if path.exists():
                 return ImageFont.truetype(str(path), size=size)
+            if self._index is not None:
+                indexed = self._index.get(path.as_posix())
+                if indexed is not None:
+                    return ImageFont.truetype(str(indexed), size=size)
             for base in self.search_paths:
                 candidate_path = base / candidate
                 if candidate_path.exists():
@@ -29,21 +58,142 @@ class FontResolver:
         return ImageFont.load_default()
 
 
+PREVIEW_QUALITY = 70
+TIER_PREVIEW = "preview"
+TIER_FULL = "full"
+
+ByteSource = Union[bytes, bytearray, memoryview]
+MemoryHook = Callable[[MemeRequest, str, "RenderMemory"], None]
+
+
+@dataclass(slots=True)
+class RenderMemory:
+    """Bytes held by one render, by stage, and the peak of their sum."""
+
+    held: Dict[str, int] = field(default_factory=dict)
+    peak: int = 0
+
+    @property
+    def current(self) -> int:
+        return sum(self.held.values())
+
+    def hold(self, label: str, nbytes: int) -> None:
+        self.held[label] = nbytes
+        self.peak = max(self.peak, self.current)
+
+    def release(self, label: str) -> None:
+        self.held.pop(label, None)
+
+
+class _BufferReader(io.RawIOBase):
+    """Seekable read-only file over a buffer, so Pillow decodes without copying it whole."""
+
+    def __init__(self, data: ByteSource) -> None:
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        chunk = self._view[self._pos : end].tobytes()
+        self._pos = max(self._pos, end)
+        return chunk
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._pos : self._pos + len(buffer)]
+        buffer[: len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        self._view.release()
+        super().close()
+
+
 class MemeRenderer:
-    def __init__(self, font_resolver: FontResolver) -> None:
+    def __init__(self, font_resolver: FontResolver, memory_hook: Optional[MemoryHook] = None) -> None:
         self.font_resolver = font_resolver
+        self.memory_hook = memory_hook
+
+    def render(self, base_bytes: ByteSource, request: MemeRequest, max_side: Optional[int] = None) -> bytes:
+        """Render the meme; with ``max_side`` a fast downscaled JPEG preview is produced instead.
+
+        The source buffer is decoded in place, cropping happens before any mode
+        conversion so only the kept pixels are converted, and each intermediate
+        image is closed as soon as it is superseded.
+        """
+        from PIL import Image
 
-    def render(self, base_bytes: bytes, request: MemeRequest) -> BytesIO:
         request.validate()
-        with Image.open(BytesIO(base_bytes)) as img:
-            img = img.convert("RGB")
+        memory = RenderMemory()
+        memory.hold("source", memoryview(base_bytes).nbytes)
+        with _BufferReader(base_bytes) as reader, Image.open(reader) as source:
+            if max_side:
+                # Let the JPEG decoder skip detail we are about to throw away,
+                # keeping enough that the cropped region still fills max_side.
+                crop = request.crop_box
+                source.draft(
+                    "RGB",
+                    (
+                        int(max_side / max(crop.width, 0.01)) if crop else max_side,
+                        int(max_side / max(crop.height, 0.01)) if crop else max_side,
+                    ),
+                )
+            img = source
+            memory.hold("image", _image_bytes(img))
             if request.crop_box:
-                img = self._apply_crop(img, request.crop_box)
+                img = self._replace(memory, img, self._apply_crop(img, request.crop_box))
+            if img.mode != "RGB":
+                img = self._replace(memory, img, img.convert("RGB"))
+            if max_side:
+                img.thumbnail((max_side, max_side), Image.Resampling.BILINEAR)
+                memory.hold("image", _image_bytes(img))
             self._draw_layers(img, request.text_layers)
-            output = BytesIO()
-            img.save(output, format=request.output_format)
-            output.seek(0)
-            return output
+            output = io.BytesIO()
+            if max_side:
+                img.save(output, format="JPEG", quality=PREVIEW_QUALITY)
+            else:
+                img.save(output, format=request.output_format)
+            img.close()
+        # getvalue() hands over the BytesIO buffer without copying it.
+        result = output.getvalue()
+        memory.release("image")
+        memory.hold("output", len(result))
+        if self.memory_hook:
+            self.memory_hook(request, TIER_PREVIEW if max_side else TIER_FULL, memory)
+        return result
+
+    def source_size(self, base_bytes: ByteSource) -> Tuple[int, int]:
+        """Return the source dimensions, reading only the image header."""
+        from PIL import Image
+
+        with _BufferReader(base_bytes) as reader, Image.open(reader) as img:
+            return img.size
+
+    def _replace(self, memory: RenderMemory, old: Image.Image, new: Image.Image) -> Image.Image:
+        # Both images are alive until the old one is closed.
+        memory.release("image")
+        memory.hold("previous", _image_bytes(old))
+        memory.hold("image", _image_bytes(new))
+        old.close()
+        memory.release("previous")
+        return new
 
     def _apply_crop(self, img: Image.Image, crop: CropBox) -> Image.Image:
         width, height = img.size
@@ -56,6 +206,8 @@ class MemeRenderer:
         return img.crop((x0, y0, x1, y1))
 
     def _draw_layers(self, img: Image.Image, layers: Iterable[TextLayer]) -> None:
+        from PIL import ImageDraw
+
         draw = ImageDraw.Draw(img)
         width, height = img.size
         for layer in layers:
@@ -136,3 +288,8 @@ class MemeRenderer:
                 current = word
         lines.append(current)
         return tuple(lines)
+
+
+def _image_bytes(img: Image.Image) -> int:
+    width, height = img.size
+    return width * height * len(img.getbands())
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+PRIORITY_PREVIEW = 0
+PRIORITY_FULL = 10
+
+
+class RenderScheduler:
+    """Runs blocking render jobs on a bounded thread pool, lowest priority value first.
+
+    Jobs only reach the pool once a worker slot is free, so under load a queued
+    preview overtakes full-quality renders that are still waiting.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mememe-render")
+        self._active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    async def run(self, priority: int, func: Callable[..., T], *args) -> T:
+        await self._acquire(priority)
+        loop = asyncio.get_running_loop()
+        try:
+            job = self._executor.submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Free the slot when the worker thread is done, not when the caller stops
+        # waiting; otherwise a cancelled caller would let a job queue in the
+        # executor's FIFO behind a still-running one, ignoring priority.
+        job.add_done_callback(lambda _: _call_soon(loop, self._release))
+        return await asyncio.wrap_future(job)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _acquire(self, priority: int) -> None:
+        if self._active < self.workers and not self.queued:
+            self._active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before cancellation.
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        # Hand the slot straight to the best waiter so it cannot be stolen.
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable[[], None]) -> None:
+    # Done callbacks run on the worker thread; hop back onto the event loop.
+    with contextlib.suppress(RuntimeError):  # loop already closed at shutdown
+        loop.call_soon_threadsafe(callback)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+READY_FONTS = "fonts"
+READY_CATALOG = "catalog"
+
+
+@dataclass(slots=True)
+class StartupTimer:
+    """Records how long each named startup phase took."""
+
+    clock: Callable[[], float] = time.perf_counter
+    _origin: float = field(init=False)
+    _phases: Dict[str, float] = field(init=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._origin = self.clock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self._phases[name] = self._phases.get(name, 0.0) + (self.clock() - started)
+
+    def elapsed(self) -> float:
+        return self.clock() - self._origin
+
+    def report(self) -> str:
+        parts = [f"{name}={seconds * 1000:.1f}ms" for name, seconds in self._phases.items()]
+        parts.append(f"total={self.elapsed() * 1000:.1f}ms")
+        return "startup " + " ".join(parts)
+
+
+@dataclass(slots=True)
+class ReadinessGate:
+    """Fires once every required component has reported in.
+
+    When ``ready_file`` is set it is touched on readiness (and removed on
+    ``reset``) so container probes can poll for it.
+    """
+
+    requirements: Set[str]
+    ready_file: Optional[Path] = None
+    _done: Set[str] = field(init=False, default_factory=set)
+    _ready: bool = field(init=False, default=False)
+    _callbacks: List[Callable[[], None]] = field(init=False, default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.requirements = set(self.requirements)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def pending(self) -> Set[str]:
+        return self.requirements - self._done
+
+    def on_ready(self, callback: Callable[[], None]) -> None:
+        if self.ready:
+            callback()
+        else:
+            self._callbacks.append(callback)
+
+    def mark(self, name: str) -> None:
+        if name not in self.requirements:
+            raise KeyError(f"Unknown readiness requirement: {name}")
+        self._done.add(name)
+        if self.ready or self.pending():
+            return
+        self._ready = True
+        if self.ready_file:
+            try:
+                self.ready_file.touch()
+            except OSError as exc:
+                logger.warning("Could not write readiness file %s: %s", self.ready_file, exc)
+        for callback in self._callbacks:
+            callback()
+        self._callbacks.clear()
+
+    def reset(self) -> None:
+        """Forget reported components and remove a ready file left by an earlier run."""
+        self._done.clear()
+        self._ready = False
+        if self.ready_file:
+            self.ready_file.unlink(missing_ok=True)
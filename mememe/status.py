@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from typing import TYPE_CHECKING, Optional
+
+from .config import STATUS_CHAT_ACTION, STATUS_MESSAGE, STATUS_THRESHOLD
+
+if TYPE_CHECKING:
+    from telegram import Message
+
+    from .outbound import OutboundSender
+
+logger = logging.getLogger(__name__)
+
+# Telegram clears a chat action after 5 seconds or when the next message lands.
+_CHAT_ACTION_REFRESH = 4.5
+
+
+class StatusReporter:
+    """Tells the user a meme is on its way while spending as few Bot API calls as possible.
+
+    * ``none`` sends nothing until the meme (or an error) arrives.
+    * ``chat_action`` shows "sending photo…" in the chat header.
+    * ``threshold`` posts a status message only if the work outlives ``threshold`` seconds.
+    * ``message`` always posts a status message up front.
+    """
+
+    def __init__(
+        self,
+        message: Message,
+        sender: OutboundSender,
+        strategy: str,
+        threshold: float,
+        text: str,
+    ) -> None:
+        self.message = message
+        self.sender = sender
+        self.strategy = strategy
+        self.threshold = threshold
+        self.text = text
+        self._status: Optional[Message] = None
+        self._task: Optional[asyncio.Task] = None
+        self._posting = False
+
+    async def start(self) -> None:
+        if self.strategy == STATUS_MESSAGE:
+            await self._post()
+        elif self.strategy == STATUS_THRESHOLD:
+            self._task = asyncio.create_task(self._post_after(self.threshold))
+        elif self.strategy == STATUS_CHAT_ACTION:
+            self._task = asyncio.create_task(self._keep_chat_action())
+
+    async def update(self, text: str) -> None:
+        """Edit the status message, if one was posted."""
+        if self._status is not None:
+            await self._edit(text)
+
+    async def finish(self, text: str = "Done ✅") -> None:
+        await self.stop()
+        if self._status is not None:
+            await self._edit(text)
+
+    async def fail(self, text: str) -> None:
+        """Report an error; always reaches the user even if no status message exists."""
+        await self.stop()
+        if self._status is not None:
+            await self._edit(text)
+        else:
+            await self.sender.send(self.message.chat_id, lambda: self.message.reply_text(text))
+
+    async def stop(self) -> None:
+        """Stop the threshold timer or chat-action loop; safe to call more than once."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        # Once the threshold message is on its way, let it land so it can be edited.
+        if not task.done() and not self._posting:
+            task.cancel()
+        with contextlib.suppress(Exception, asyncio.CancelledError):
+            await task
+
+    async def _post(self) -> None:
+        self._status = await self.sender.send(self.message.chat_id, lambda: self.message.reply_text(self.text))
+
+    async def _post_after(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._posting = True
+        await self._post()
+
+    async def _keep_chat_action(self) -> None:
+        while True:
+            try:
+                await self.sender.send(
+                    self.message.chat_id,
+                    lambda: self.message.reply_chat_action("upload_photo"),
+                    key=("chat_action", self.message.chat_id),
+                )
+            except Exception as exc:
+                logger.debug("Chat action failed: %s", exc)
+            await asyncio.sleep(_CHAT_ACTION_REFRESH)
+
+    async def _edit(self, text: str) -> None:
+        status = self._status
+        await self.sender.send(
+            status.chat_id,
+            lambda: status.edit_text(text),
+            key=("status", status.chat_id, status.message_id),
+        )
@@ -5,8 +5,6 @@ import logging
 from dataclasses import dataclass, field
 from typing import Dict, Iterable, List, Optional
 
-import httpx
-
 from .models import MemeTemplate
 
 logger = logging.getLogger(__name__)
@@ -64,7 +62,10 @@ class TemplateCatalog:
             raise KeyError(f"Template {template_id} not found after refresh.")
         return refreshed
 
-    async def refresh(self) -> None:
+    async def refresh(self) -> bool:
+        """Fetch a fresh snapshot; returns ``False`` when the existing cache was kept."""
+        import httpx
+
         async with self._lock:
             try:
                 async with httpx.AsyncClient(timeout=httpx.Timeout(15.0)) as client:
@@ -72,7 +73,7 @@ class TemplateCatalog:
                     response.raise_for_status()
             except Exception as exc:  # pragma: no cover - network failure
                 logger.warning("Failed to refresh templates: %s", exc)
-                return
+                return False
             data = response.json()
             memes = data.get("data", {}).get("memes", []) if isinstance(data, dict) else []
             updated: Dict[str, MemeTemplate] = {}
@@ -91,5 +92,6 @@ class TemplateCatalog:
             if updated:
                 self._templates = updated
                 logger.info("Template catalog refreshed with %d entries.", len(updated))
-            else:
-                logger.warning("Template refresh returned no entries; keeping existing cache.")
+                return True
+            logger.warning("Template refresh returned no entries; keeping existing cache.")
+            return False